@@ -0,0 +1,62 @@
+"""In-process response cache for read-heavy list endpoints"""
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import time
+
+
+class ResponseCache:
+    """Small LRU cache with a TTL, cleared whenever new snapshots are written"""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        # Bumped by clear(); lets a writer that read the data before a clear
+        # avoid storing what is now stale (see set)
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Store value under key, evicting the least recently used entry if full
+
+        Pass the generation read before computing value; if the cache has been
+        cleared since, value may predate that write and is not stored.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry (call after writes that change listed data)"""
+        self._entries.clear()
+        self.generation += 1
+
+
+# Shared by /snapshots and /changes; keys start with the endpoint name
+response_cache = ResponseCache()
+
+# /ai/ask answers to repeated questions; unaffected by monitoring writes
+answer_cache = ResponseCache(maxsize=512, ttl=24 * 60 * 60)
+
+# /monitor/inject-test-snapshot responses, keyed by the snapshot they created
+injected_snapshots = ResponseCache(maxsize=16, ttl=60 * 60)
+
+# AI summaries of individual changes, keyed by a digest of the change itself
+summary_cache = ResponseCache(maxsize=4096, ttl=24 * 60 * 60)
@@ -1,6 +1,6 @@
 """Application configuration"""
 from pydantic_settings import BaseSettings
-from functools import lru_cache
+from typing import Final
 import os
 
 
@@ -19,14 +19,23 @@ class Settings(BaseSettings):
     # Monitoring settings
     crawl_schedule_hours: int = 24
     
+    # Database settings
+    # Statements slower than this are logged as warnings (0 disables the check)
+    slow_query_ms: int = 100
+    
     # API settings
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    # Browser origins allowed to call the API directly (the Vite dev proxy is same-origin)
+    cors_origins: list[str] = ["http://localhost:5000", "http://127.0.0.1:5000"]
     
-    model_config = {"env_file": ".env", "extra": "ignore"}
+    model_config = {"env_file": ".env", "extra": "ignore", "frozen": True}
+
+
+# Parsed once at import; every caller shares this instance
+SETTINGS: Final[Settings] = Settings()
 
 
-@lru_cache()
 def get_settings() -> Settings:
-    """Get cached settings instance"""
-    return Settings()
\ No newline at end of file
+    """Get the process-wide settings instance"""
+    return SETTINGS
\ No newline at end of file
@@ -1,32 +1,75 @@
 """Database configuration and session management"""
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
+import asyncio
+import logging
+import time
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+def _async_url(database_url: str) -> URL:
+    """Point a plain Postgres URL at the asyncpg driver"""
+    url = make_url(database_url)
+    query = dict(url.query)
+    # asyncpg takes ssl=<mode> rather than libpq's sslmode
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(drivername="postgresql+asyncpg", query=query)
+
+
 # Create engine - Railway provides DATABASE_URL automatically
-engine = create_engine(
-    settings.database_url,
+engine = create_async_engine(
+    _async_url(settings.database_url),
+    pool_size=20,        # Steady-state connections shared by requests and the scheduler
+    max_overflow=10,     # Extra connections allowed during bursts
+    pool_use_lifo=True,  # Reuse the most recently returned (warm) connection first
+    pool_timeout=5,      # Fail fast (503) instead of queueing forever when the pool is exhausted
     pool_pre_ping=True,  # Verify connections before using
-    pool_recycle=300,    # Recycle connections every 5 minutes
+    pool_recycle=1800,   # Recycle connections every 30 minutes
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if settings.slow_query_ms > 0:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_started) * 1000
+        if elapsed_ms > settings.slow_query_ms:
+            logger.warning(f"Slow query ({elapsed_ms:.0f} ms): {statement[:500]}")
+
+AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """Dependency for FastAPI routes"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
+async def warm_pool():
+    """Open the pool's steady-state connections up front so early requests skip the connect handshake"""
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(engine.pool.size())), return_exceptions=True
+    )
+    failures = [r for r in results if isinstance(r, BaseException)]
+    for conn in results:
+        if not isinstance(conn, BaseException):
+            await conn.close()  # Returns it to the pool, still connected
+    if failures:
+        logger.warning(f"Pool warm-up opened {len(results) - len(failures)} connection(s); first error: {failures[0]}")
+
+
+async def init_db():
     """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -1,14 +1,26 @@
 """FastAPI application entry point"""
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy import Text, cast, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple
+import base64
+import hashlib
 import logging
+import orjson
+from uuid import UUID
 
+from app.cache import answer_cache, injected_snapshots, response_cache
 from app.config import get_settings
-from app.db.database import get_db, init_db
+from app.db.database import engine, get_db, init_db, warm_pool
 from app.models.models import Snapshot, Change, AlertSubscription, SpecType, ChangeMaturity
-from app.services.monitoring_service import MonitoringService
+from app.services.monitoring_service import MonitoringService, drain_background_tasks, monitoring_lock
+from app.services.stripe_crawler import get_crawler
 from app.scheduler.scheduler import start_scheduler, stop_scheduler
 
 # Configure logging
@@ -19,36 +31,52 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize database and start scheduler, then clean up on shutdown"""
+    logger.info("Starting up...")
+    await init_db()
+    await warm_pool()
+    start_scheduler()
+    logger.info("Application started successfully")
+    
+    yield
+    
+    logger.info("Shutting down...")
+    stop_scheduler()
+    await drain_background_tasks()
+    await get_crawler().aclose()
+
+
 app = FastAPI(
     title="Gateway Monitor API",
     description="Monitor Stripe API changes automatically across multiple tiers",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database and start scheduler"""
-    logger.info("Starting up...")
-    init_db()
-    start_scheduler()
-    logger.info("Application started successfully")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown"""
-    logger.info("Shutting down...")
-    stop_scheduler()
 
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """Every pooled connection stayed busy past pool_timeout; ask the client to retry"""
+    logger.warning(f"Database pool exhausted: {engine.pool.status()}")
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": "Database busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
 
 @app.get("/")
 async def root():
@@ -57,7 +85,8 @@ async def root():
         "status": "healthy",
         "service": "Gateway Monitor",
         "version": "2.0.0",
-        "tiers": ["stable", "preview", "beta"]
+        "tiers": ["stable", "preview", "beta"],
+        "db_pool": engine.pool.status()
     }
 
 
@@ -67,8 +96,8 @@ async def root():
 
 @app.post("/monitor/run")
 async def run_monitoring(
-    tier: Optional[str] = None,
-    db: Session = Depends(get_db)
+    tier: Optional[SpecType] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Trigger monitoring for all tiers or a specific tier
@@ -79,17 +108,18 @@ async def run_monitoring(
     try:
         service = MonitoringService(db)
         
-        if tier:
-            # Run single tier
-            if tier not in ["stable", "preview", "beta"]:
-                raise HTTPException(status_code=400, detail="Invalid tier. Must be stable, preview, or beta")
+        async with monitoring_lock() as acquired:
+            if not acquired:
+                return {"status": "already_running", "message": "A monitoring run is already in progress"}
             
-            result = await service._monitor_tier(tier)
-            return result
-        else:
-            # Run all tiers
-            result = await service.run_monitoring()
-            return result
+            if tier:
+                # Run single tier
+                result = await service._monitor_tier(tier.value)
+                return result
+            else:
+                # Run all tiers
+                result = await service.run_monitoring()
+                return result
             
     except Exception as e:
         logger.error(f"Monitoring failed: {e}")
@@ -100,7 +130,7 @@ async def run_monitoring(
 async def compare_tiers(
     source: str,
     target: str = "stable",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Compare two tiers to see upcoming features
@@ -128,63 +158,208 @@ async def compare_tiers(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ============================================================================
+# LISTING HELPERS
+# ============================================================================
+
+# /snapshots and /changes buffer each page to compute its ETag, so page size is
+# capped to keep that buffer bounded; walk further with /changes?cursor=...
+MAX_LISTING_LIMIT = 100
+
+# Listing selects are built once at import; handlers only add filters and a
+# limit, so each request reuses the same statement shape (and compiled SQL)
+_SNAPSHOTS_SELECT = select(
+    Snapshot.id,
+    Snapshot.gateway,
+    Snapshot.endpoint_path,
+    Snapshot.spec_type,
+    Snapshot.created_at
+).order_by(Snapshot.created_at.desc())
+
+# Project only the columns the response needs; the join supplies the tier
+_CHANGES_SELECT = select(
+    Change.id,
+    Change.change_type,
+    Change.field_path,
+    Change.severity,
+    Change.change_category,
+    Change.change_maturity,
+    Snapshot.spec_type,
+    Change.ai_summary,
+    Change.detected_at
+).join(Snapshot).order_by(Change.detected_at.desc(), Change.id.desc())
+
+
+def _encode_cursor(detected_at: datetime, change_id: Any) -> str:
+    """Opaque keyset cursor pointing just past the given change"""
+    return base64.urlsafe_b64encode(f"{detected_at.isoformat()}|{change_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverse of _encode_cursor; raises ValueError on malformed input"""
+    detected_at, change_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(detected_at), UUID(change_id)
+
+
+async def _stream_listing(
+    key: str,
+    rows: AsyncIterator[Any],
+    to_item: Callable[[Any], Dict[str, Any]],
+    with_count: bool = False,
+    cursor_of: Optional[Callable[[Any], str]] = None
+) -> AsyncIterator[bytes]:
+    """
+    Encode {"<key>": [...]} one row at a time as rows arrive from the cursor
+    
+    With with_count set, a trailing "count" field carries the number of rows.
+    With cursor_of set, a trailing "next_cursor" field carries the cursor
+    of the last row (null on an empty page). orjson encodes datetimes
+    natively; ids still need str() because asyncpg returns its own UUID
+    subclass, which orjson rejects.
+    """
+    yield b'{"' + key.encode() + b'":['
+    
+    count = 0
+    last = None
+    async for row in rows:
+        chunk = orjson.dumps(to_item(row))
+        if count:
+            chunk = b"," + chunk
+        count += 1
+        last = row
+        yield chunk
+    
+    tail = b"]"
+    if with_count:
+        tail += b',"count":' + str(count).encode()
+    if cursor_of is not None:
+        tail += b',"next_cursor":' + orjson.dumps(cursor_of(last) if count else None)
+    tail += b"}"
+    yield tail
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check: "*", or any listed tag equal to etag (weak W/ tags included)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def _listing_response(etag: str, body: bytes, if_none_match: Optional[str]) -> Response:
+    """The listing body with its ETag, or an empty 304 if the client already has it"""
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+async def _render_listing(
+    chunks: AsyncIterator[bytes],
+    cache_key: Hashable,
+    generation: int,
+    if_none_match: Optional[str] = None
+) -> Response:
+    """
+    Buffer a _stream_listing body so its ETag goes out with the first response
+    
+    Pages are at most MAX_LISTING_LIMIT rows, which bounds the buffer. The
+    body and ETag are stored in response_cache, unless the cache was cleared
+    after generation (read before the query) was taken.
+    """
+    body = b"".join([chunk async for chunk in chunks])
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    response_cache.set(cache_key, (etag, body), generation)
+    return _listing_response(etag, body, if_none_match)
+
+
+def _cached_listing(cache_key: Hashable, if_none_match: Optional[str] = None) -> Optional[Response]:
+    """
+    Replay a previously rendered listing body, if still cached
+    
+    Pollers that send back the cached ETag get an empty 304 instead.
+    """
+    cached = response_cache.get(cache_key)
+    if cached is None:
+        return None
+    
+    etag, body = cached
+    return _listing_response(etag, body, if_none_match)
+
+
 # ============================================================================
 # SNAPSHOT ENDPOINTS
 # ============================================================================
 
 @app.get("/snapshots")
 async def get_snapshots(
-    limit: int = 10,
-    tier: Optional[str] = None,
-    db: Session = Depends(get_db)
+    limit: int = Query(10, ge=1, le=MAX_LISTING_LIMIT),
+    tier: Optional[SpecType] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get recent snapshots
     
     Query params:
-    - limit: Number of snapshots to return (default: 10)
+    - limit: Number of snapshots to return (default: 10, max: 100)
     - tier: Filter by tier - 'stable', 'preview', or 'beta' (optional)
     """
-    query = db.query(Snapshot)
+    cache_key = ("snapshots", limit, tier)
+    generation = response_cache.generation
+    cached = _cached_listing(cache_key, if_none_match)
+    if cached is not None:
+        return cached
+    
+    stmt = _SNAPSHOTS_SELECT
     
     if tier:
-        if tier not in ["stable", "preview", "beta"]:
-            raise HTTPException(status_code=400, detail="Invalid tier")
-        spec_type_enum = SpecType[tier.upper()]
-        query = query.filter(Snapshot.spec_type == spec_type_enum)
+        stmt = stmt.where(Snapshot.spec_type == tier)
     
-    snapshots = query.order_by(Snapshot.created_at.desc()).limit(limit).all()
+    snapshots = await db.stream(stmt.limit(limit))
     
-    return {
-        "snapshots": [
-            {
+    return await _render_listing(
+        _stream_listing(
+            "snapshots",
+            snapshots,
+            lambda s: {
                 "id": str(s.id),
                 "gateway": s.gateway,
                 "endpoint": s.endpoint_path,
                 "tier": s.spec_type.value,
-                "created_at": s.created_at.isoformat()
+                "created_at": s.created_at
             }
-            for s in snapshots
-        ]
-    }
+        ),
+        cache_key,
+        generation,
+        if_none_match
+    )
 
 
 @app.get("/snapshots/stats")
-async def get_snapshot_stats(db: Session = Depends(get_db)):
+async def get_snapshot_stats(db: AsyncSession = Depends(get_db)):
     """Get snapshot statistics by tier"""
     try:
         from sqlalchemy import func
         
         # Count snapshots by spec_type
-        results = db.query(
-            Snapshot.spec_type,
-            func.count(Snapshot.id).label('count')
-        ).group_by(Snapshot.spec_type).all()
+        results = (await db.execute(
+            select(
+                Snapshot.spec_type,
+                func.count(Snapshot.id).label('count')
+            ).group_by(Snapshot.spec_type)
+        )).all()
         
         return {
             "stats": [
                 {
-                    "tier": result.spec_type.value if hasattr(result.spec_type, 'value') else str(result.spec_type),
+                    "tier": result.spec_type.value,
                     "count": result.count
                 }
                 for result in results
@@ -197,26 +372,43 @@ async def get_snapshot_stats(db: Session = Depends(get_db)):
 
 
 
+# schema_data comes back as the JSON text Postgres already holds, so the
+# detail response can embed it without parsing and re-encoding the document
+_SNAPSHOT_DETAIL_SELECT = select(
+    Snapshot.id,
+    Snapshot.gateway,
+    Snapshot.endpoint_path,
+    Snapshot.spec_type,
+    Snapshot.spec_url,
+    Snapshot.created_at,
+    cast(Snapshot.schema_data, Text).label("schema_json")
+)
+
+
 @app.get("/snapshots/{snapshot_id}")
-async def get_snapshot_detail(snapshot_id: str, db: Session = Depends(get_db)):
+async def get_snapshot_detail(snapshot_id: str, db: AsyncSession = Depends(get_db)):
     """Get full snapshot details including schema"""
     from uuid import UUID
     
     try:
-        snapshot = db.query(Snapshot).filter(Snapshot.id == UUID(snapshot_id)).first()
+        snapshot = (await db.execute(
+            _SNAPSHOT_DETAIL_SELECT.where(Snapshot.id == UUID(snapshot_id))
+        )).first()
         
         if not snapshot:
             raise HTTPException(status_code=404, detail="Snapshot not found")
         
-        return {
+        head = orjson.dumps({
             "id": str(snapshot.id),
             "gateway": snapshot.gateway,
             "endpoint": snapshot.endpoint_path,
             "tier": snapshot.spec_type.value,
             "spec_url": snapshot.spec_url,
-            "created_at": snapshot.created_at.isoformat(),
-            "schema_data": snapshot.schema_data
-        }
+            "created_at": snapshot.created_at
+        })
+        # Splice the stored schema text in as the last field
+        body = head[:-1] + b',"schema_data":' + snapshot.schema_json.encode() + b"}"
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -228,73 +420,97 @@ async def get_snapshot_detail(snapshot_id: str, db: Session = Depends(get_db)):
 
 @app.get("/changes")
 async def get_changes(
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=MAX_LISTING_LIMIT),
     severity: str = None,
-    tier: Optional[str] = None,
-    maturity: Optional[str] = None,
-    db: Session = Depends(get_db)
+    tier: Optional[SpecType] = None,
+    maturity: Optional[ChangeMaturity] = None,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get recent changes with filtering
     
     Query params:
-    - limit: Number of changes (default: 20)
+    - limit: Number of changes (default: 20, max: 100)
     - severity: Filter by severity - 'high', 'medium', 'low', 'info'
     - tier: Filter by tier - 'stable', 'preview', 'beta'
     - maturity: Filter by maturity - 'stable_change', 'new_preview', 'new_beta', etc.
+    - cursor: next_cursor from the previous page, to continue past it
     """
-    query = db.query(Change).join(Snapshot)
+    cache_key = ("changes", limit, severity, tier, maturity, cursor)
+    generation = response_cache.generation
+    cached = _cached_listing(cache_key, if_none_match)
+    if cached is not None:
+        return cached
+    
+    stmt = _CHANGES_SELECT
     
     if severity:
-        query = query.filter(Change.severity == severity)
+        stmt = stmt.where(Change.severity == severity)
     
     if tier:
-        if tier not in ["stable", "preview", "beta"]:
-            raise HTTPException(status_code=400, detail="Invalid tier")
-        spec_type_enum = SpecType[tier.upper()]
-        query = query.filter(Snapshot.spec_type == spec_type_enum)
+        stmt = stmt.where(Snapshot.spec_type == tier)
     
     if maturity:
+        stmt = stmt.where(Change.change_maturity == maturity)
+    
+    if cursor:
         try:
-            maturity_enum = ChangeMaturity[maturity.upper()]
-            query = query.filter(Change.change_maturity == maturity_enum)
-        except KeyError:
-            raise HTTPException(status_code=400, detail="Invalid maturity level")
+            after = _decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # Keyset pagination: resume strictly after the last row already seen
+        stmt = stmt.where(tuple_(Change.detected_at, Change.id) < after)
     
-    changes = query.order_by(Change.detected_at.desc()).limit(limit).all()
+    changes = await db.stream(stmt.limit(limit))
     
-    return {
-        "changes": [
-            {
+    return await _render_listing(
+        _stream_listing(
+            "changes",
+            changes,
+            lambda c: {
                 "id": str(c.id),
                 "type": c.change_type,
                 "field": c.field_path,
                 "severity": c.severity,
                 "category": c.change_category,
                 "maturity": c.change_maturity.value if c.change_maturity else None,
-                "tier": c.snapshot.spec_type.value,
+                "tier": c.spec_type.value,
                 "summary": c.ai_summary,
-                "detected_at": c.detected_at.isoformat()
-            }
-            for c in changes
-        ]
-    }
+                "detected_at": c.detected_at
+            },
+            cursor_of=lambda c: _encode_cursor(c.detected_at, c.id)
+        ),
+        cache_key,
+        generation,
+        if_none_match
+    )
 
 
 @app.post("/monitor/inject-test-snapshot")
-async def inject_test_snapshot(db: Session = Depends(get_db)):
+async def inject_test_snapshot(db: AsyncSession = Depends(get_db)):
     """Create a modified snapshot for testing change detection"""
     from app.models.models import Snapshot
-    import copy
     
     # Get the latest real snapshot
-    latest = db.query(Snapshot).order_by(Snapshot.created_at.desc()).first()
+    latest_id = (await db.execute(
+        select(Snapshot.id).order_by(Snapshot.created_at.desc()).limit(1)
+    )).scalar()
     
-    if not latest:
+    if not latest_id:
         return {"error": "No snapshots found. Run /monitor/run first."}
     
-    # Deep copy the schema
-    schema = copy.deepcopy(latest.schema_data)
+    # If the latest snapshot is one this endpoint just created, another copy
+    # would only stack the same modifications on it; hand back that result
+    injected = injected_snapshots.get(str(latest_id))
+    if injected is not None:
+        return injected
+    
+    latest = await db.get(Snapshot, latest_id)
+    
+    # Deep copy the schema (JSON-only tree, so an orjson round-trip is a faithful copy)
+    schema = orjson.loads(orjson.dumps(latest.schema_data))
     
     # Properties are at ROOT level!
     if "properties" in schema:
@@ -330,11 +546,13 @@ async def inject_test_snapshot(db: Session = Depends(get_db)):
         schema_data=schema
     )
     
+    # The id is generated client-side on insert, and expire_on_commit=False keeps
+    # it readable, so no refresh round-trip is needed after the commit
     db.add(new_snapshot)
-    db.commit()
-    db.refresh(new_snapshot)
+    await db.commit()
+    response_cache.clear()
     
-    return {
+    result = {
         "status": "success",
         "message": "Created modified test snapshot",
         "original_snapshot_id": str(latest.id),
@@ -348,6 +566,9 @@ async def inject_test_snapshot(db: Session = Depends(get_db)):
         ],
         "next_step": "Run POST /monitor/run to detect these changes"
     }
+    injected_snapshots.set(result["new_snapshot_id"], result)
+    
+    return result
 
 
 # ============================================================================
@@ -355,13 +576,26 @@ async def inject_test_snapshot(db: Session = Depends(get_db)):
 # ============================================================================
 
 from pydantic import BaseModel
-from typing import Any
-import os
-from openai import OpenAI
+from app.services.ai_analyzer import get_openai_client
+
+class FieldContext(BaseModel):
+    name: Optional[str] = None
+    type: Optional[str] = None
+    tier: str = "stable"
+    description: Optional[str] = None
+    required: Optional[bool] = None
+
+class ChatMessage(BaseModel):
+    role: str = "user"
+    content: str = ""
+
+class AIContext(BaseModel):
+    field: FieldContext = FieldContext()
+    conversationHistory: List[ChatMessage] = []
 
 class AIQuestion(BaseModel):
     question: str
-    context: dict[str, Any]
+    context: AIContext = AIContext()
 
 PAYMENTS_SME_SYSTEM_PROMPT = """You are a Senior Payments Expert and Subject Matter Expert (SME) on payment gateway APIs, with deep expertise in Stripe's API architecture, payment flows, and integration patterns.
 
@@ -384,40 +618,55 @@ Keep responses concise but informative. Use bullet points for clarity. Focus on
 async def ask_ai(request: AIQuestion):
     """Ask AI about a field or API change"""
     try:
-        client = OpenAI(
-            api_key=os.environ.get("AI_INTEGRATIONS_OPENAI_API_KEY"),
-            base_url=os.environ.get("AI_INTEGRATIONS_OPENAI_BASE_URL")
-        )
+        field_info = request.context.field
+        tier = field_info.tier
+        conversation_history = request.context.conversationHistory[-6:]
         
-        field_info = request.context.get('field', {})
-        tier = field_info.get('tier', 'stable')
+        # Identical questions about GA fields get the same answer; preview and
+        # beta fields still move, so those always go to the model
+        cache_key = None
+        if tier == 'stable':
+            cache_key = hashlib.sha256(orjson.dumps(
+                [
+                    field_info.model_dump(),
+                    [msg.model_dump() for msg in conversation_history],
+                    request.question
+                ],
+                option=orjson.OPT_SORT_KEYS
+            )).hexdigest()
+            cached_answer = answer_cache.get(cache_key)
+            if cached_answer is not None:
+                return {"answer": cached_answer}
         
         context_str = f"""
 **Field Being Discussed:**
-- Field Name: `{field_info.get('name', 'Unknown')}`
-- Data Type: {field_info.get('type', 'Unknown')}
+- Field Name: `{field_info.name or 'Unknown'}`
+- Data Type: {field_info.type or 'Unknown'}
 - API Tier: {tier.upper()} {'(Generally Available)' if tier == 'stable' else '(Not yet in GA - subject to change)'}
-- Description from Stripe: {field_info.get('description', 'No description available')}
-- Required: {'Yes' if field_info.get('required') else 'No'}
+- Description from Stripe: {field_info.description or 'No description available'}
+- Required: {'Yes' if field_info.required else 'No'}
 """
         
         messages = [
             {"role": "system", "content": PAYMENTS_SME_SYSTEM_PROMPT}
         ]
         
-        conversation_history = request.context.get('conversationHistory', [])
-        for msg in conversation_history[-6:]:
-            messages.append({"role": msg.get('role', 'user'), "content": msg.get('content', '')})
+        for msg in conversation_history:
+            messages.append({"role": msg.role, "content": msg.content})
         
         messages.append({"role": "user", "content": f"{context_str}\n\n**User Question:** {request.question}"})
         
-        response = client.chat.completions.create(
+        response = await get_openai_client().chat.completions.create(
             model="gpt-5",
             messages=messages,
             max_completion_tokens=800
         )
         
-        return {"answer": response.choices[0].message.content}
+        answer = response.choices[0].message.content
+        if cache_key is not None:
+            answer_cache.set(cache_key, answer)
+        
+        return {"answer": answer}
     except Exception as e:
         logger.error(f"AI query failed: {e}")
         return {"answer": f"Sorry, I couldn't process your question. Error: {str(e)}"}
@@ -434,45 +683,55 @@ class SubscribeRequest(BaseModel):
     email: str
 
 @app.post("/subscribe")
-async def subscribe(request: SubscribeRequest, db: Session = Depends(get_db)):
+async def subscribe(request: SubscribeRequest, db: AsyncSession = Depends(get_db)):
     """Subscribe to API change alerts"""
     try:
-        existing = db.query(AlertSubscription).filter(AlertSubscription.email == request.email).first()
-        
-        if existing:
-            existing.name = request.name
-            existing.is_active = True
-            db.commit()
-            return {"status": "success", "message": "Subscription updated successfully"}
-        
-        subscription = AlertSubscription(
+        # One atomic round-trip; xmax is 0 only on rows this statement inserted
+        stmt = pg_insert(AlertSubscription).values(
             name=request.name,
             email=request.email,
             is_active=True
-        )
-        db.add(subscription)
-        db.commit()
+        ).on_conflict_do_update(
+            index_elements=[AlertSubscription.email],
+            set_={"name": request.name, "is_active": True}
+        ).returning(literal_column("xmax = 0").label("inserted"))
+        
+        inserted = (await db.execute(stmt)).scalar()
+        await db.commit()
+        
+        if not inserted:
+            return {"status": "success", "message": "Subscription updated successfully"}
         
         logger.info(f"New subscription: {request.email}")
         return {"status": "success", "message": "Subscribed successfully"}
     except Exception as e:
         logger.error(f"Subscription failed: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to subscribe")
 
 @app.get("/subscribers")
-async def list_subscribers(db: Session = Depends(get_db)):
+async def list_subscribers(db: AsyncSession = Depends(get_db)):
     """List all active subscribers (admin only)"""
-    subscribers = db.query(AlertSubscription).filter(AlertSubscription.is_active == True).all()
-    return {
-        "subscribers": [
-            {
+    subscribers = await db.stream(
+        select(
+            AlertSubscription.id,
+            AlertSubscription.name,
+            AlertSubscription.email,
+            AlertSubscription.created_at
+        ).where(AlertSubscription.is_active == True).execution_options(yield_per=256)
+    )
+    
+    return StreamingResponse(
+        _stream_listing(
+            "subscribers",
+            subscribers,
+            lambda s: {
                 "id": str(s.id),
                 "name": s.name,
                 "email": s.email,
-                "created_at": s.created_at.isoformat()
-            }
-            for s in subscribers
-        ],
-        "count": len(subscribers)
-    }
\ No newline at end of file
+                "created_at": s.created_at
+            },
+            with_count=True
+        ),
+        media_type="application/json"
+    )
\ No newline at end of file
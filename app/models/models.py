@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, JSON, Enum as SQLEnum, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, Column, String, Integer, Text, DateTime, Boolean, Enum as SQLEnum, ForeignKey, Index, event, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -29,12 +29,36 @@ class Snapshot(Base):
     endpoint_path = Column(String, nullable=False)
     spec_type = Column(SQLEnum(SpecType), nullable=False, default=SpecType.STABLE)
     spec_url = Column(String, nullable=True)
-    schema_data = Column(JSON, nullable=False)
+    spec_etag = Column(String, nullable=True)  # Upstream ETag, for conditional re-fetch
+    schema_data = Column(JSONB, nullable=False)
+    schema_hash = Column(String, nullable=True)  # Digest of schema_data, see monitoring_service.schema_hash
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     changes = relationship("Change", back_populates="snapshot", cascade="all, delete-orphan")
 
+# Serves /snapshots?tier=... and the per-tier latest-snapshot lookup, newest first
+Index("ix_snapshots_spec_type_created_at", Snapshot.spec_type, Snapshot.created_at.desc())
+
+# Serves the unfiltered /snapshots listing
+Index("ix_snapshots_created_at", Snapshot.created_at.desc())
+
+
+def _server_has_lz4(ddl, target, bind, **kw) -> bool:
+    """True on PostgreSQL 14+ built with lz4 (the only servers listing it for TOAST)"""
+    return bool(bind.execute(text(
+        "SELECT 'lz4' = ANY(enumvals) FROM pg_settings WHERE name = 'default_toast_compression'"
+    )).scalar())
+
+
+# Schemas are compressed with lz4 rather than pglz where the server supports it;
+# existing databases get this from migrations/compress_schema_data_lz4.py
+event.listen(
+    Snapshot.__table__,
+    "after_create",
+    DDL("ALTER TABLE snapshots ALTER COLUMN schema_data SET COMPRESSION lz4").execute_if(callable_=_server_has_lz4)
+)
+
 class Change(Base):
     __tablename__ = "changes"
     
@@ -42,8 +66,8 @@ class Change(Base):
     snapshot_id = Column(UUID(as_uuid=True), ForeignKey('snapshots.id'), nullable=False)  # FIXED: Added ForeignKey
     change_type = Column(String, nullable=False)
     field_path = Column(String, nullable=False)
-    old_value = Column(Text, nullable=True)
-    new_value = Column(Text, nullable=True)
+    old_value = Column(JSONB, nullable=True)  # Property defs, enum lists, flags or strings
+    new_value = Column(JSONB, nullable=True)
     severity = Column(String, nullable=False)
     change_category = Column(String, nullable=True)
     change_maturity = Column(SQLEnum(ChangeMaturity), nullable=True)
@@ -53,6 +77,15 @@ class Change(Base):
     # Relationships
     snapshot = relationship("Snapshot", back_populates="changes")
 
+# Serves the unfiltered /changes listing (and tier-only filters via the join)
+Index("ix_changes_detected_at", Change.detected_at.desc())
+
+# Serves /changes?severity=... ordered by newest first
+Index("ix_changes_severity_detected_at", Change.severity, Change.detected_at.desc())
+
+# Serves /changes?maturity=... ordered by newest first
+Index("ix_changes_maturity_detected_at", Change.change_maturity, Change.detected_at.desc())
+
 class AlertSubscription(Base):
     __tablename__ = "alert_subscriptions"
     
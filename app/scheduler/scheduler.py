@@ -5,8 +5,8 @@ from datetime import datetime
 import logging
 
 from app.config import get_settings
-from app.db.database import SessionLocal
-from app.services.monitoring_service import MonitoringService
+from app.db.database import AsyncSessionLocal
+from app.services.monitoring_service import MonitoringService, monitoring_lock
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -17,15 +17,17 @@ scheduler = AsyncIOScheduler()
 async def scheduled_monitoring_job():
     """Job that runs on schedule"""
     logger.info("Running scheduled monitoring job...")
-    db = SessionLocal()
-    try:
-        service = MonitoringService(db)
-        result = await service.run_monitoring()
-        logger.info(f"Monitoring completed: {result}")
-    except Exception as e:
-        logger.error(f"Scheduled monitoring failed: {e}")
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        try:
+            async with monitoring_lock() as acquired:
+                if not acquired:
+                    logger.info("Monitoring already running elsewhere; skipping this run")
+                    return
+                service = MonitoringService(db)
+                result = await service.run_monitoring()
+                logger.info(f"Monitoring completed: {result}")
+        except Exception as e:
+            logger.error(f"Scheduled monitoring failed: {e}")
 
 
 def start_scheduler():
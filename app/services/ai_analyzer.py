@@ -1,45 +1,82 @@
 """AI-powered change analysis using OpenAI"""
 
-from openai import OpenAI
-from typing import Dict, Any, Optional
-import json
+from openai import AsyncOpenAI
+from typing import Dict, Any, List, Optional
+import asyncio
+from functools import lru_cache
+import hashlib
 import logging
+import orjson
 import os
+from app.cache import summary_cache
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Upper bound on in-flight OpenAI requests, to stay inside rate limits
+MAX_CONCURRENT_ANALYSES = 8
+
+# Changes summarized per OpenAI request by analyze_changes
+ANALYSIS_BATCH_SIZE = 10
+
+ANALYST_SYSTEM_PROMPT = ("You are an expert API analyst. "
+                         "Provide concise, business-focused summaries of API changes.")
+
+# DiffEngine change_type -> category stored on the Change row
+CHANGE_CATEGORIES = {
+    "property_added": "enhancement",
+    "property_removed": "breaking_change",
+    "type_changed": "breaking_change",
+    "field_now_required": "breaking_change",
+    "field_no_longer_required": "enhancement",
+    "enum_values_added": "enhancement",
+    "enum_values_removed": "breaking_change",
+    "description_changed": "documentation",
+}
+
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Process-wide OpenAI client, so every caller shares one connection pool
+
+    Built on first use so missing credentials only fail AI calls.
+    """
+    # Using Replit's AI Integrations service (modelfarm)
+    return AsyncOpenAI(
+        api_key=os.environ.get("AI_INTEGRATIONS_OPENAI_API_KEY"),
+        base_url=os.environ.get("AI_INTEGRATIONS_OPENAI_BASE_URL"),
+    )
+
 
 class AIAnalyzer:
     """Uses AI to analyze and summarize API changes"""
 
     def __init__(self):
-        # Using Replit's AI Integrations service (modelfarm)
-        self.client = OpenAI(
-            api_key=os.environ.get("AI_INTEGRATIONS_OPENAI_API_KEY"),
-            base_url=os.environ.get("AI_INTEGRATIONS_OPENAI_BASE_URL"),
-        )
-
         self.ai_enabled = bool(
             os.environ.get("AI_INTEGRATIONS_OPENAI_BASE_URL"))
         logger.info(f"AI Analyzer enabled: {self.ai_enabled}")
+        # Summaries currently being generated, by _summary_key, so concurrent
+        # callers (the tier runs and comparisons of one cycle) share them
+        self._in_flight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Shared OpenAI client (see get_openai_client)"""
+        return get_openai_client()
 
     async def analyze_change(self, change: Dict[str, Any]) -> Optional[str]:
         """Generate AI summary for a single change"""
         try:
             prompt = self._build_prompt(change)
 
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="gpt-5",
                 messages=[
                     {
-                        "role":
-                        "system",
-                        "content":
-                        ("You are an expert API analyst. "
-                         "Provide concise, business-focused summaries of API changes."
-                         ),
+                        "role": "system",
+                        "content": ANALYST_SYSTEM_PROMPT,
                     },
                     {
                         "role": "user",
@@ -55,21 +92,153 @@ class AIAnalyzer:
             logger.error(f"AI analysis failed: {e}", exc_info=True)
             return None
 
-    def _build_prompt(self, change: Dict[str, Any]) -> str:
-        """Build prompt for AI analysis"""
+    def cached_summaries(self, changes: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Summaries already in summary_cache, in input order (None where missing)"""
+        return [summary_cache.get(self._summary_key(change)) for change in changes]
+
+    async def analyze_changes(self, changes: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Generate AI summaries for several changes, in input order
+
+        Changes go out ANALYSIS_BATCH_SIZE per request, with at most
+        MAX_CONCURRENT_ANALYSES requests in flight. Changes summarized before
+        (e.g. by the other tier comparison) come from summary_cache instead,
+        and changes another call is already analyzing are waited on.
+        """
+        keys = [self._summary_key(change) for change in changes]
+        summaries: List[Optional[str]] = [summary_cache.get(key) for key in keys]
+
+        # Each distinct uncached change is analyzed once, by whichever call
+        # claims it first
+        loop = asyncio.get_running_loop()
+        pending: Dict[str, Dict[str, Any]] = {}
+        waiting: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+        for key, change, summary in zip(keys, changes, summaries):
+            if summary is not None or key in pending or key in waiting:
+                continue
+            if key in self._in_flight:
+                waiting[key] = self._in_flight[key]
+            else:
+                pending[key] = change
+                self._in_flight[key] = loop.create_future()
+        if not pending and not waiting:
+            return summaries
+
+        fresh: Dict[str, Optional[str]] = {}
+        try:
+            fresh.update(await self._analyze_pending(pending))
+        finally:
+            for key in pending:
+                self._in_flight.pop(key).set_result(fresh.get(key))
+
+        for key, future in waiting.items():
+            # Shielded so a cancelled caller doesn't cancel it for the owner
+            fresh[key] = await asyncio.shield(future)
+
+        return [fresh.get(key) if summary is None else summary
+                for key, summary in zip(keys, summaries)]
+
+    async def _analyze_pending(self, pending: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        """Analyze changes keyed by _summary_key in batches, caching the results"""
+        if not pending:
+            return {}
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+
+        async def analyze(batch: List[Dict[str, Any]]) -> List[Optional[str]]:
+            async with semaphore:
+                return await self.analyze_change_batch(batch)
+
+        todo = list(pending.values())
+        batches = [
+            todo[i:i + ANALYSIS_BATCH_SIZE]
+            for i in range(0, len(todo), ANALYSIS_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(analyze(batch) for batch in batches))
+
+        fresh = dict(zip(pending, (summary for batch in results for summary in batch)))
+        for key, summary in fresh.items():
+            # Failures (None) are left uncached so the next run retries them
+            if summary is not None:
+                summary_cache.set(key, summary)
+        return fresh
+
+    def _summary_key(self, change: Dict[str, Any]) -> str:
+        """Content key for a change; equal changes share a summary"""
+        return hashlib.blake2b(
+            orjson.dumps(change, option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).hexdigest()
+
+    async def analyze_change_batch(self, changes: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Summarize several changes with one request, falling back to one request each"""
+        if len(changes) == 1:
+            return [await self.analyze_change(changes[0])]
+
+        try:
+            response = await self.client.chat.completions.create(
+                model="gpt-5",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": ANALYST_SYSTEM_PROMPT,
+                    },
+                    {
+                        "role": "user",
+                        "content": self._build_batch_prompt(changes),
+                    },
+                ],
+                response_format={"type": "json_object"},
+                max_completion_tokens=200 * len(changes),
+            )
+
+            summaries = orjson.loads(response.choices[0].message.content)["summaries"]
+            if len(summaries) != len(changes) or not all(isinstance(s, str) for s in summaries):
+                raise ValueError(f"expected {len(changes)} summaries, got {summaries!r:.200}")
+            return [summary.strip() for summary in summaries]
+
+        except Exception as e:
+            logger.warning(f"Batched AI analysis failed, analyzing individually: {e}")
+            return [await self.analyze_change(change) for change in changes]
+
+    def _describe_change(self, change: Dict[str, Any]) -> str:
+        """Render the fields of one change for a prompt"""
         change_type = change.get("change_type", "")
         field_path = change.get("field_path", "")
         old_value = change.get("old_value")
         new_value = change.get("new_value")
         severity = change.get("severity", "unknown")
 
-        return f"""Analyze this API change for Stripe Payment Intents:
-
-Change Type: {change_type}
+        return f"""Change Type: {change_type}
 Field: {field_path}
 Severity: {severity}
-Old Value: {json.dumps(old_value, indent=2) if old_value else "None"}
-New Value: {json.dumps(new_value, indent=2) if new_value else "None"}
+Old Value: {orjson.dumps(old_value, option=orjson.OPT_INDENT_2).decode() if old_value else "None"}
+New Value: {orjson.dumps(new_value, option=orjson.OPT_INDENT_2).decode() if new_value else "None"}"""
+
+    def _build_batch_prompt(self, changes: List[Dict[str, Any]]) -> str:
+        """Build one prompt covering several changes, asking for a JSON reply"""
+        described = "\n\n".join(
+            f"Change {i}:\n{self._describe_change(change)}"
+            for i, change in enumerate(changes, start=1)
+        )
+
+        return f"""Analyze these {len(changes)} API changes for Stripe Payment Intents:
+
+{described}
+
+For each change, provide a concise summary (2–3 sentences) covering:
+1. What changed and why it matters
+2. Potential impact on developers
+3. Recommended action (if any)
+
+Reply with a JSON object {{"summaries": [...]}} holding exactly one summary
+string per change, in the order given.
+"""
+
+    def _build_prompt(self, change: Dict[str, Any]) -> str:
+        """Build prompt for AI analysis"""
+        return f"""Analyze this API change for Stripe Payment Intents:
+
+{self._describe_change(change)}
 
 Provide a concise summary (2–3 sentences) covering:
 1. What changed and why it matters
@@ -77,19 +246,12 @@ Provide a concise summary (2–3 sentences) covering:
 3. Recommended action (if any)
 """
 
-    async def categorize_change(self, change: Dict[str, Any]) -> str:
+    def categorize_change(self, change: Dict[str, Any]) -> str:
         """Categorize the type of change"""
-        change_type = change.get("change_type", "")
+        return CHANGE_CATEGORIES.get(change.get("change_type", ""), "other")
+
 
-        categories = {
-            "property_added": "enhancement",
-            "property_removed": "breaking_change",
-            "type_changed": "breaking_change",
-            "field_now_required": "breaking_change",
-            "field_no_longer_required": "enhancement",
-            "enum_values_added": "enhancement",
-            "enum_values_removed": "breaking_change",
-            "description_changed": "documentation",
-        }
-
-        return categories.get(change_type, "other")
+@lru_cache(maxsize=1)
+def get_ai_analyzer() -> AIAnalyzer:
+    """Get the shared analyzer instance (and its OpenAI client)"""
+    return AIAnalyzer()
@@ -1,6 +1,6 @@
 """Schema comparison and diff engine"""
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,9 +32,12 @@ class DiffEngine:
                     "severity": self._determine_severity("added", prop_def)
                 })
         
-        # Find removed properties
+        # Find removed and modified properties in one pass over the old schema;
+        # removals are still reported ahead of modifications
+        modified = []
         for prop_name, prop_def in old_props.items():
-            if prop_name not in new_props:
+            new_def = new_props.get(prop_name)
+            if new_def is None:
                 changes.append({
                     "change_type": "property_removed",
                     "field_path": f"properties.{prop_name}",
@@ -42,16 +45,11 @@ class DiffEngine:
                     "new_value": None,
                     "severity": "high"  # Removals are usually breaking
                 })
-        
-        # Find modified properties
-        for prop_name in old_props.keys():
-            if prop_name in new_props:
-                prop_changes = self._compare_property(
-                    prop_name, 
-                    old_props[prop_name], 
-                    new_props[prop_name]
-                )
-                changes.extend(prop_changes)
+            elif new_def != prop_def:
+                # Most properties are untouched between snapshots; the dict
+                # equality check runs in C and skips them without a field walk
+                modified.extend(self._compare_property(prop_name, prop_def, new_def))
+        changes.extend(modified)
         
         # Compare required fields
         old_required = set(old_schema.get("required", []))
@@ -119,8 +117,10 @@ class DiffEngine:
         new_enum = new_prop.get("enum", [])
         
         if old_enum != new_enum:
-            added_values = set(new_enum) - set(old_enum)
-            removed_values = set(old_enum) - set(new_enum)
+            old_values = set(old_enum)
+            new_values = set(new_enum)
+            added_values = new_values - old_values
+            removed_values = old_values - new_values
             
             if added_values:
                 changes.append({
@@ -153,3 +153,9 @@ class DiffEngine:
             return "high"
         
         return "medium"
+
+
+@lru_cache(maxsize=1)
+def get_diff_engine() -> DiffEngine:
+    """Get the shared diff engine instance"""
+    return DiffEngine()
@@ -1,41 +1,145 @@
 """Multi-tier monitoring service orchestrator"""
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Coroutine, Optional, Set
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from datetime import datetime
+import asyncio
+import hashlib
 import logging
+import orjson
+import uuid
 
-from app.services.stripe_crawler import StripeCrawler
-from app.services.diff_engine import DiffEngine
-from app.services.ai_analyzer import AIAnalyzer
+from app.cache import response_cache
+from app.db.database import AsyncSessionLocal, engine
+from app.services.stripe_crawler import get_crawler
+from app.services.diff_engine import get_diff_engine
+from app.services.ai_analyzer import get_ai_analyzer
 from app.models.models import Snapshot, Change, SpecType, ChangeMaturity
 
 logger = logging.getLogger(__name__)
 
+# Latest-snapshot lookup shared by every call; callers add the tier filter.
+# Monitoring only reads these columns of the previous snapshot.
+_LATEST_SNAPSHOT_SELECT = (
+    select(Snapshot)
+    .options(load_only(Snapshot.id, Snapshot.spec_etag, Snapshot.schema_hash, Snapshot.schema_data))
+    .where(Snapshot.gateway == "stripe")
+    .where(Snapshot.endpoint_path == "/v1/payment_intents")
+    .order_by(Snapshot.created_at.desc())
+    .limit(1)
+)
+
+# Above this many change rows, _monitor_tier writes them with COPY instead
+# of an executemany INSERT
+COPY_THRESHOLD = 100
+
+# Column order for COPY into changes; must match _copy_changes
+_CHANGE_COPY_COLUMNS = (
+    "id", "snapshot_id", "change_type", "field_path", "old_value", "new_value",
+    "severity", "change_category", "change_maturity", "ai_summary", "detected_at",
+)
+
+# Postgres advisory lock key held for the duration of a monitoring run, so the
+# scheduler and /monitor/run (on any worker) never crawl at the same time
+MONITORING_LOCK_KEY = 7_301_144
+
+
+@asynccontextmanager
+async def monitoring_lock() -> AsyncIterator[bool]:
+    """
+    Try to take the cluster-wide monitoring lock without waiting
+    
+    Yields True if this caller holds the lock, False if another run is
+    already in progress. The lock lives on its own connection so the
+    commits made during monitoring don't release it.
+    """
+    async with engine.connect() as conn:
+        acquired = (await conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MONITORING_LOCK_KEY}
+        )).scalar()
+        # connect() autobegins; end that transaction so the connection sits
+        # idle (not "idle in transaction") for the run - the session-level
+        # lock survives the commit
+        await conn.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": MONITORING_LOCK_KEY}
+                )
+                await conn.commit()
+
+# AI summaries are written after the run returns; tasks are kept referenced
+# here until they finish so they aren't garbage collected mid-flight
+_background_tasks: Set["asyncio.Task[None]"] = set()
+
+
+def _run_in_background(coro: Coroutine[Any, Any, None]) -> None:
+    """Schedule coro on the running loop without awaiting it"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def drain_background_tasks() -> None:
+    """Wait for pending AI summaries (called on application shutdown)"""
+    if _background_tasks:
+        logger.info(f"Waiting for {len(_background_tasks)} background summary task(s)...")
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    """Content digest of a snapshot schema; equal schemas always hash equal"""
+    return hashlib.blake2b(orjson.dumps(schema, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
 class MonitoringService:
     """Orchestrates multi-tier monitoring workflow"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, latest_snapshots: Optional[Dict[str, Snapshot]] = None):
         self.db = db
-        self.crawler = StripeCrawler()
-        self.diff_engine = DiffEngine()
-        self.ai_analyzer = AIAnalyzer()
+        # Latest snapshot per tier seen during this cycle, shared with the
+        # services run_monitoring spawns on their own sessions
+        self._latest_snapshots = latest_snapshots if latest_snapshots is not None else {}
+        # Shared per process; the analyzer in particular owns an OpenAI client
+        # that should not be rebuilt per request
+        self.crawler = get_crawler()
+        self.diff_engine = get_diff_engine()
+        self.ai_analyzer = get_ai_analyzer()
     
     async def run_monitoring(self) -> Dict[str, Any]:
         """Run complete multi-tier monitoring cycle"""
         logger.info("Starting multi-tier monitoring cycle...")
+        self._latest_snapshots.clear()
         
+        # Tiers are independent (separate spec downloads), so fetch them concurrently
+        stable, preview, beta = await asyncio.gather(
+            self._in_own_session(MonitoringService._monitor_tier, "stable"),
+            self._in_own_session(MonitoringService._monitor_tier, "preview"),
+            self._in_own_session(MonitoringService._monitor_tier, "beta")
+        )
         results = {
-            "stable": await self._monitor_tier("stable"),
-            "preview": await self._monitor_tier("preview"),
-            "beta": await self._monitor_tier("beta")
+            "stable": stable,
+            "preview": preview,
+            "beta": beta
         }
         
-        # Compare preview vs stable
-        preview_vs_stable = await self._compare_tiers("preview", "stable")
-        results["preview_vs_stable"] = preview_vs_stable
+        # Nothing moved upstream, so the tier comparisons would repeat the last run
+        if all(result.get("status") == "unchanged" for result in results.values()):
+            logger.info("No tier changed upstream; skipping tier comparisons")
+            results["status"] = "unchanged"
+            return results
         
-        # Compare beta vs stable
-        beta_vs_stable = await self._compare_tiers("beta", "stable")
+        # Compare preview and beta against stable concurrently
+        preview_vs_stable, beta_vs_stable = await asyncio.gather(
+            # Summaries the cache doesn't have yet are generated in the background
+            self._in_own_session(MonitoringService._compare_tiers, "preview", "stable", False),
+            self._in_own_session(MonitoringService._compare_tiers, "beta", "stable", False)
+        )
+        results["preview_vs_stable"] = preview_vs_stable
         results["beta_vs_stable"] = beta_vs_stable
         
         return results
@@ -44,53 +148,99 @@ class MonitoringService:
         """Monitor a single tier"""
         logger.info(f"Monitoring {spec_type} tier...")
         
-        # Fetch current schema
-        current_schema = await self.crawler.get_payment_intents_snapshot(spec_type)
-        
         # Get previous snapshot for this tier
-        previous_snapshot = self._get_latest_snapshot(spec_type)
+        previous_snapshot = await self._get_latest_snapshot(spec_type)
+        previous_etag = previous_snapshot.spec_etag if previous_snapshot else None
+        
+        # End the read transaction so no pooled connection is held during the
+        # spec download (expire_on_commit=False keeps previous_snapshot loaded)
+        await self.db.commit()
+        
+        # Fetch current schema, conditional on the upstream spec having changed
+        current_schema, etag = await self.crawler.get_payment_intents_snapshot(spec_type, previous_etag)
+        
+        current_hash = schema_hash(current_schema) if current_schema is not None else None
         
-        # Create new snapshot
-        spec_type_enum = SpecType[spec_type.upper()]
+        if current_schema is not None and previous_snapshot and previous_snapshot.schema_hash == current_hash:
+            # The spec moved but not the Payment Intents part of it: keep the
+            # existing snapshot (with the new ETag) instead of storing a copy
+            await self.db.execute(
+                update(Snapshot).where(Snapshot.id == previous_snapshot.id).values(spec_etag=etag)
+            )
+            await self.db.commit()
+            previous_snapshot.spec_etag = etag
+            current_schema = None
+        
+        if current_schema is None:
+            return {
+                "spec_type": spec_type,
+                "status": "unchanged",
+                "snapshot_id": str(previous_snapshot.id),
+                "changes_count": 0,
+                "changes": []
+            }
+        
+        # Create new snapshot; the id is assigned up front so the change rows
+        # can reference it before anything is written
+        spec_type_enum = SpecType(spec_type)
         new_snapshot = Snapshot(
+            id=uuid.uuid4(),
             gateway="stripe",
             endpoint_path="/v1/payment_intents",
             spec_type=spec_type_enum,
             spec_url=self.crawler.SPEC_URLS[spec_type],
-            schema_data=current_schema
+            spec_etag=etag,
+            schema_data=current_schema,
+            schema_hash=current_hash
         )
-        self.db.add(new_snapshot)
-        self.db.commit()
-        self.db.refresh(new_snapshot)
         
         # Compare if previous exists
         changes_detected = []
+        change_rows = []
         if previous_snapshot:
             changes = self.diff_engine.compare_schemas(
                 previous_snapshot.schema_data,
                 current_schema
             )
             
-            # Analyze and save changes
+            # AI summaries are filled in after the rows are saved, see
+            # _summarize_changes; categorization is a local lookup
             for change_data in changes:
-                ai_summary = await self.ai_analyzer.analyze_change(change_data)
-                category = await self.ai_analyzer.categorize_change(change_data)
-                
-                change_record = Change(
-                    snapshot_id=new_snapshot.id,
-                    change_type=change_data["change_type"],
-                    field_path=change_data["field_path"],
-                    old_value=change_data.get("old_value"),
-                    new_value=change_data.get("new_value"),
-                    severity=change_data.get("severity", "medium"),
-                    change_category=category,
-                    change_maturity=ChangeMaturity.STABLE_CHANGE if spec_type == "stable" else None,
-                    ai_summary=ai_summary
-                )
-                self.db.add(change_record)
+                change_rows.append({
+                    "id": uuid.uuid4(),
+                    "snapshot_id": new_snapshot.id,
+                    "change_type": change_data["change_type"],
+                    "field_path": change_data["field_path"],
+                    "old_value": change_data.get("old_value"),
+                    "new_value": change_data.get("new_value"),
+                    "severity": change_data.get("severity", "medium"),
+                    "change_category": self.ai_analyzer.categorize_change(change_data),
+                    "change_maturity": ChangeMaturity.STABLE_CHANGE if spec_type == "stable" else None,
+                    "ai_summary": None
+                })
                 changes_detected.append(change_data)
-            
-            self.db.commit()
+        
+        # Save the snapshot and its changes in one transaction (one commit per
+        # tier); expire_on_commit=False keeps new_snapshot readable afterwards
+        self.db.add(new_snapshot)
+        await self.db.flush()
+        # One executemany INSERT (or COPY for large diffs); the rows aren't
+        # needed as ORM objects
+        if len(change_rows) > COPY_THRESHOLD:
+            await self._copy_changes(change_rows)
+        elif change_rows:
+            await self.db.execute(insert(Change), change_rows)
+        await self.db.commit()
+        # The tier comparisons later in the cycle want exactly this snapshot
+        self._latest_snapshots[spec_type] = new_snapshot
+        
+        # New snapshot (and possibly changes) invalidate cached listings
+        response_cache.clear()
+        
+        if change_rows:
+            _run_in_background(self._summarize_changes(
+                [row["id"] for row in change_rows], changes_detected
+            ))
         
         return {
             "spec_type": spec_type,
@@ -99,16 +249,89 @@ class MonitoringService:
             "changes": changes_detected
         }
     
-    async def _compare_tiers(self, source_tier: str, target_tier: str) -> Dict[str, Any]:
-        """Compare two tiers to find differences"""
+    async def _copy_changes(self, change_rows: List[Dict[str, Any]]) -> None:
+        """Write change rows with COPY on the session's connection (same transaction)"""
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        detected_at = datetime.utcnow()
+        
+        # asyncpg takes JSONB as JSON text (None becomes JSON null, as with the
+        # INSERT path), and the enum column stores member names
+        records = [
+            (
+                row["id"],
+                row["snapshot_id"],
+                row["change_type"],
+                row["field_path"],
+                orjson.dumps(row["old_value"]).decode(),
+                orjson.dumps(row["new_value"]).decode(),
+                row["severity"],
+                row["change_category"],
+                row["change_maturity"].name if row["change_maturity"] else None,
+                row["ai_summary"],
+                detected_at,
+            )
+            for row in change_rows
+        ]
+        await raw.driver_connection.copy_records_to_table(
+            Change.__tablename__, records=records, columns=_CHANGE_COPY_COLUMNS
+        )
+    
+    async def _summarize_changes(self, change_ids: List[Any], changes: List[Dict[str, Any]]) -> None:
+        """Generate AI summaries for saved changes and store them on their rows"""
+        try:
+            summaries = await self.ai_analyzer.analyze_changes(changes)
+            rows = [
+                {"id": change_id, "ai_summary": ai_summary}
+                for change_id, ai_summary in zip(change_ids, summaries)
+                if ai_summary is not None
+            ]
+            if not rows:
+                return
+            
+            # Bulk UPDATE by primary key, on a session of its own since the
+            # one that saved the changes may be closed by now
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(Change), rows)
+                await db.commit()
+            response_cache.clear()
+            logger.info(f"Stored AI summaries for {len(rows)} change(s)")
+        except Exception as e:
+            logger.error(f"Storing AI summaries failed: {e}", exc_info=True)
+    
+    async def _warm_summaries(self, changes: List[Dict[str, Any]]) -> None:
+        """Generate AI summaries into summary_cache, for changes that aren't stored"""
+        try:
+            await self.ai_analyzer.analyze_changes(changes)
+        except Exception as e:
+            logger.error(f"Generating AI summaries failed: {e}", exc_info=True)
+    
+    async def _compare_tiers(self, source_tier: str, target_tier: str, summarize: bool = True) -> Dict[str, Any]:
+        """
+        Compare two tiers to find differences
+        
+        With summarize=False, AI summaries come only from summary_cache (None
+        where missing) and the missing ones are generated in the background,
+        so the caller doesn't wait on the AI calls.
+        """
         logger.info(f"Comparing {source_tier} vs {target_tier}...")
         
-        source_snapshot = self._get_latest_snapshot(source_tier)
-        target_snapshot = self._get_latest_snapshot(target_tier)
+        source_snapshot = await self._get_latest_snapshot(source_tier)
+        target_snapshot = await self._get_latest_snapshot(target_tier)
         
         if not source_snapshot or not target_snapshot:
             return {"error": "Missing snapshots for comparison"}
         
+        # Release the connection before the AI calls below
+        await self.db.commit()
+        
+        if source_snapshot.schema_hash and source_snapshot.schema_hash == target_snapshot.schema_hash:
+            return {
+                "comparison": f"{source_tier}_vs_{target_tier}",
+                "upcoming_features_count": 0,
+                "changes": []
+            }
+        
         # Find what's in source but not in target (upcoming features)
         changes = self.diff_engine.compare_schemas(
             target_snapshot.schema_data,
@@ -119,8 +342,13 @@ class MonitoringService:
         maturity = ChangeMaturity.NEW_PREVIEW if source_tier == "preview" else ChangeMaturity.NEW_BETA
         
         analyzed_changes = []
-        for change_data in changes:
-            ai_summary = await self.ai_analyzer.analyze_change(change_data)
+        if summarize:
+            summaries = await self.ai_analyzer.analyze_changes(changes)
+        else:
+            summaries = self.ai_analyzer.cached_summaries(changes)
+            if None in summaries:
+                _run_in_background(self._warm_summaries(changes))
+        for change_data, ai_summary in zip(changes, summaries):
             analyzed_changes.append({
                 "change": change_data,
                 "maturity": maturity.value,
@@ -134,12 +362,26 @@ class MonitoringService:
             "changes": analyzed_changes
         }
     
-    def _get_latest_snapshot(self, spec_type: str) -> Optional[Snapshot]:
-        """Get the most recent snapshot for a spec type"""
-        spec_type_enum = SpecType[spec_type.upper()]
-        return self.db.query(Snapshot) \
-            .filter(Snapshot.gateway == "stripe") \
-            .filter(Snapshot.endpoint_path == "/v1/payment_intents") \
-            .filter(Snapshot.spec_type == spec_type_enum) \
-            .order_by(Snapshot.created_at.desc()) \
-            .first()
\ No newline at end of file
+    async def _in_own_session(
+        self,
+        method: Callable[..., Awaitable[Dict[str, Any]]],
+        *args: Any
+    ) -> Dict[str, Any]:
+        """Run a MonitoringService method on a fresh session (a session can't be shared across concurrent tasks)"""
+        async with AsyncSessionLocal() as db:
+            return await method(MonitoringService(db, self._latest_snapshots), *args)
+    
+    async def _get_latest_snapshot(self, spec_type: str) -> Optional[Snapshot]:
+        """Get the most recent snapshot for a spec type (at most one query per tier per cycle)"""
+        cached = self._latest_snapshots.get(spec_type)
+        if cached is not None:
+            return cached
+        
+        spec_type_enum = SpecType(spec_type)
+        result = await self.db.execute(
+            _LATEST_SNAPSHOT_SELECT.where(Snapshot.spec_type == spec_type_enum)
+        )
+        snapshot = result.scalars().first()
+        if snapshot is not None:
+            self._latest_snapshots[spec_type] = snapshot
+        return snapshot
\ No newline at end of file
@@ -1,10 +1,26 @@
 """Stripe API crawler service"""
 import httpx
+from functools import lru_cache
+import ijson
 import logging
-from typing import Dict, Any, Optional
+import orjson
+from typing import Dict, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Key path from an operation to its form-encoded request schema
+REQUEST_SCHEMA_PATH = ("requestBody", "content", "application/x-www-form-urlencoded", "schema")
+
+
+def _walk(node: Any, keys: Tuple[str, ...]) -> Dict[str, Any]:
+    """Follow keys through nested dicts, returning {} at the first miss"""
+    for key in keys:
+        node = node.get(key) if isinstance(node, dict) else None
+        if node is None:
+            return {}
+    return node
+
+
 class StripeCrawler:
     """Fetches Stripe API specifications from GitHub"""
     
@@ -15,12 +31,40 @@ class StripeCrawler:
         "beta": "https://raw.githubusercontent.com/stripe/openapi/master/openapi/spec3.beta.sdk.json"
     }
     
-    async def fetch_spec(self, spec_type: str = "stable") -> Dict[str, Any]:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client shared by every fetch, so connections to GitHub are reused"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                # All three tiers live on the same host
+                limits=httpx.Limits(max_connections=8, max_keepalive_connections=4)
+            )
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client (called on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def fetch_spec(
+        self,
+        spec_type: str = "stable",
+        etag: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """
         Fetch OpenAPI specification from Stripe
         
         Args:
             spec_type: One of 'stable', 'preview', or 'beta'
+            etag: ETag of the last fetched copy, sent as If-None-Match
+        
+        Returns:
+            (spec, etag) - spec is None when the server answers 304 Not Modified
         """
         url = self.SPEC_URLS.get(spec_type)
         if not url:
@@ -28,31 +72,86 @@ class StripeCrawler:
         
         logger.info(f"Fetching {spec_type} spec from: {url}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
+        headers = {"If-None-Match": etag} if etag else {}
+        response = await self.client.get(url, headers=headers)
+        if response.status_code == 304:
+            logger.info(f"{spec_type} spec not modified since ETag {etag}")
+            return None, etag
+        response.raise_for_status()
+        return orjson.loads(response.content), response.headers.get("etag")
+    
+    async def fetch_operation(
+        self,
+        spec_type: str,
+        path: str,
+        method: str,
+        etag: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch a single operation from the OpenAPI specification
+        
+        The spec is parsed as it streams in and only the requested operation
+        is built into Python objects; the download stops once it is complete.
+        
+        Args:
+            spec_type: One of 'stable', 'preview', or 'beta'
+            path: API path, e.g. '/v1/payment_intents'
+            method: Lower-case HTTP method, e.g. 'post'
+            etag: ETag of the last fetched copy, sent as If-None-Match
+        
+        Returns:
+            (operation, etag) - operation is None when the server answers 304
+            Not Modified, and {} when the spec has no such operation
+        """
+        url = self.SPEC_URLS.get(spec_type)
+        if not url:
+            raise ValueError(f"Invalid spec_type: {spec_type}")
+        
+        logger.info(f"Fetching {spec_type} {method.upper()} {path} from: {url}")
+        
+        headers = {"If-None-Match": etag} if etag else {}
+        async with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                logger.info(f"{spec_type} spec not modified since ETag {etag}")
+                return None, etag
             response.raise_for_status()
-            return response.json()
+            
+            found = ijson.sendable_list()
+            parser = ijson.items_coro(found, f"paths.{path}.{method}", use_float=True)
+            async for chunk in response.aiter_bytes():
+                parser.send(chunk)
+                if found:
+                    break
+            else:
+                parser.close()
+            
+            return (found[0] if found else {}), response.headers.get("etag")
     
-    async def get_payment_intents_snapshot(self, spec_type: str = "stable") -> Dict[str, Any]:
+    async def get_payment_intents_snapshot(
+        self,
+        spec_type: str = "stable",
+        etag: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """
         Extract Payment Intents endpoint schema from spec
         
         Args:
             spec_type: One of 'stable', 'preview', or 'beta'
-        """
-        spec = await self.fetch_spec(spec_type)
+            etag: ETag of the last fetched spec; see fetch_operation
         
+        Returns:
+            (snapshot, etag) - snapshot is None when the spec is unchanged
+        """
         # Extract POST /v1/payment_intents endpoint
-        payment_intents_path = spec.get("paths", {}).get("/v1/payment_intents", {})
-        post_endpoint = payment_intents_path.get("post", {})
+        post_endpoint, etag = await self.fetch_operation(spec_type, "/v1/payment_intents", "post", etag)
+        if post_endpoint is None:
+            return None, etag
         
         if not post_endpoint:
             raise ValueError("Payment Intents POST endpoint not found in spec")
         
         # Extract request schema
-        request_body = post_endpoint.get("requestBody", {})
-        content = request_body.get("content", {}).get("application/x-www-form-urlencoded", {})
-        schema = content.get("schema", {})
+        schema = _walk(post_endpoint, REQUEST_SCHEMA_PATH)
         
         # Return structured snapshot
         return {
@@ -61,4 +160,10 @@ class StripeCrawler:
             "schema": schema,
             "properties": schema.get("properties", {}),
             "required": schema.get("required", [])
-        }
\ No newline at end of file
+        }, etag
+
+
+@lru_cache(maxsize=1)
+def get_crawler() -> StripeCrawler:
+    """Get the shared crawler instance"""
+    return StripeCrawler()
@@ -6,12 +6,13 @@ Run this after setup.py to create the complete application
 
 import os
 import pathlib
+from concurrent.futures import ThreadPoolExecutor
 
 files = {
     # ============= CONFIG =============
     "app/config.py": '''"""Application configuration"""
 from pydantic_settings import BaseSettings
-from functools import lru_cache
+from typing import Final
 
 
 class Settings(BaseSettings):
@@ -32,14 +33,16 @@ class Settings(BaseSettings):
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     
-    class Config:
-        env_file = ".env"
+    model_config = {"env_file": ".env", "extra": "ignore", "frozen": True}
+
+
+# Parsed once at import; every caller shares this instance
+SETTINGS: Final[Settings] = Settings()
 
 
-@lru_cache()
 def get_settings() -> Settings:
-    """Get cached settings instance"""
-    return Settings()
+    """Get the process-wide settings instance"""
+    return SETTINGS
 ''',
 
     # ============= DATABASE =============
@@ -791,12 +794,18 @@ CRAWL_SCHEDULE_HOURS=24
 ''',
 }
 
-# Create all files
-for filepath, content in files.items():
+def write_file(filepath, content):
+    """Write one generated file, creating its directory first"""
     path = pathlib.Path(filepath)
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(content, encoding='utf-8')
-    print(f"✅ Created {filepath}")
+    return filepath
+
+# Create all files; paths are disjoint, so the writes can overlap (map keeps
+# the results, and so the printed order, the same as the dict)
+with ThreadPoolExecutor(max_workers=8) as executor:
+    for filepath in executor.map(write_file, files.keys(), files.values()):
+        print(f"✅ Created {filepath}")
 
 print("\n" + "="*60)
 print("🎉 ALL APPLICATION FILES CREATED SUCCESSFULLY!")
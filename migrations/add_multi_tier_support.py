@@ -1,6 +1,6 @@
 """
 Migration script to add multi-tier support
-Run this once to update existing database
+Run this once to update existing database, then convert_tier_columns_to_enum.py
 """
 from sqlalchemy import create_engine, text
 from app.config import get_settings
@@ -10,15 +10,11 @@ engine = create_engine(settings.database_url)
 
 def migrate():
     with engine.connect() as conn:
-        # Add spec_type column with default
-        conn.execute(text("""
-            ALTER TABLE snapshots 
-            ADD COLUMN IF NOT EXISTS spec_type VARCHAR DEFAULT 'STABLE'
-        """))
-        
-        # Add spec_url column
+        # Add spec_type column with default and spec_url column, in one
+        # ALTER so the table lock is taken once
         conn.execute(text("""
             ALTER TABLE snapshots 
+            ADD COLUMN IF NOT EXISTS spec_type VARCHAR DEFAULT 'STABLE',
             ADD COLUMN IF NOT EXISTS spec_url VARCHAR
         """))
         
@@ -0,0 +1,49 @@
+"""
+Migration script to add indexes for the API's list queries
+Run this once to update existing database
+"""
+from sqlalchemy import create_engine, text
+from app.config import get_settings
+
+settings = get_settings()
+engine = create_engine(settings.database_url)
+
+def migrate():
+    with engine.connect() as conn:
+        # /changes filtered by severity, newest first
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_changes_severity_detected_at
+            ON changes (severity, detected_at DESC)
+        """))
+        
+        # /snapshots filtered by tier, and the latest snapshot per tier
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_snapshots_spec_type_created_at
+            ON snapshots (spec_type, created_at DESC)
+        """))
+        
+        # /changes filtered by maturity, newest first
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_changes_maturity_detected_at
+            ON changes (change_maturity, detected_at DESC)
+        """))
+        
+        # Unfiltered /snapshots and /changes listings, newest first
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_snapshots_created_at
+            ON snapshots (created_at DESC)
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_changes_detected_at
+            ON changes (detected_at DESC)
+        """))
+        
+        # Refresh planner statistics so the new indexes get picked up
+        conn.execute(text("ANALYZE snapshots"))
+        conn.execute(text("ANALYZE changes"))
+        
+        conn.commit()
+        print("✅ Migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,23 @@
+"""
+Migration script to store the upstream spec ETag on snapshots
+Run this once to update existing database
+"""
+from sqlalchemy import create_engine, text
+from app.config import get_settings
+
+settings = get_settings()
+engine = create_engine(settings.database_url)
+
+def migrate():
+    with engine.connect() as conn:
+        # ETag of the spec each snapshot was built from, sent as If-None-Match
+        conn.execute(text("""
+            ALTER TABLE snapshots 
+            ADD COLUMN IF NOT EXISTS spec_etag VARCHAR
+        """))
+        
+        conn.commit()
+        print("✅ Migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,30 @@
+"""
+Migration script to compress snapshot schemas with lz4 instead of pglz
+Run this once to update existing database (PostgreSQL 14+)
+"""
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import NotSupportedError
+from app.config import get_settings
+
+settings = get_settings()
+engine = create_engine(settings.database_url)
+
+def migrate():
+    with engine.connect() as conn:
+        # Only affects values written from now on; existing rows keep pglz
+        # until they are rewritten (e.g. VACUUM FULL snapshots)
+        try:
+            conn.execute(text("""
+                ALTER TABLE snapshots 
+                ALTER COLUMN schema_data SET COMPRESSION lz4
+            """))
+        except NotSupportedError:
+            # Server built without lz4; schemas stay pglz-compressed
+            print("⚠️ lz4 not available on this server, keeping pglz")
+            return
+        
+        conn.commit()
+        print("✅ Migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,25 @@
+"""
+Migration script to store change old/new values as JSONB instead of text
+Run this once to update existing database
+"""
+from sqlalchemy import create_engine, text
+from app.config import get_settings
+
+settings = get_settings()
+engine = create_engine(settings.database_url)
+
+def migrate():
+    with engine.connect() as conn:
+        # Existing rows hold bare strings (e.g. descriptions), which are not
+        # valid JSON text; to_jsonb keeps them as JSON strings
+        conn.execute(text("""
+            ALTER TABLE changes 
+            ALTER COLUMN old_value TYPE JSONB USING to_jsonb(old_value),
+            ALTER COLUMN new_value TYPE JSONB USING to_jsonb(new_value)
+        """))
+        
+        conn.commit()
+        print("✅ Migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,29 @@
+"""
+Migration script to store snapshot schemas as JSONB with a content hash
+Run this once to update existing database
+"""
+from sqlalchemy import create_engine, text
+from app.config import get_settings
+
+settings = get_settings()
+engine = create_engine(settings.database_url)
+
+def migrate():
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE snapshots 
+            ALTER COLUMN schema_data TYPE JSONB USING schema_data::jsonb
+        """))
+        
+        # Digest of schema_data; existing rows stay NULL and are simply
+        # diffed as before on the next run
+        conn.execute(text("""
+            ALTER TABLE snapshots 
+            ADD COLUMN IF NOT EXISTS schema_hash VARCHAR
+        """))
+        
+        conn.commit()
+        print("✅ Migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
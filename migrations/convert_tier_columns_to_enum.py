@@ -0,0 +1,59 @@
+"""
+Migration script to store spec_type/change_maturity as native enum types
+Run this once to update existing database (created via add_multi_tier_support.py)
+"""
+from sqlalchemy import create_engine, text
+from app.config import get_settings
+
+settings = get_settings()
+engine = create_engine(settings.database_url)
+
+def migrate():
+    with engine.connect() as conn:
+        # asyncpg binds these columns as $1::spectype / $1::changematurity, so
+        # the types must exist; labels are the enum member names, as
+        # SQLAlchemy's Enum stores them
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'spectype') THEN
+                    CREATE TYPE spectype AS ENUM ('STABLE', 'PREVIEW', 'BETA');
+                END IF;
+                IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'changematurity') THEN
+                    CREATE TYPE changematurity AS ENUM (
+                        'STABLE_CHANGE', 'PREVIEW_TO_STABLE', 'BETA_TO_PREVIEW',
+                        'NEW_PREVIEW', 'NEW_BETA'
+                    );
+                END IF;
+            END $$
+        """))
+
+        # The VARCHAR default can't be cast automatically, so it is dropped
+        # and re-added around the type change; skipped if already converted
+        spec_type = conn.execute(text("""
+            SELECT udt_name FROM information_schema.columns
+            WHERE table_name = 'snapshots' AND column_name = 'spec_type'
+        """)).scalar()
+        if spec_type != "spectype":
+            conn.execute(text("""
+                ALTER TABLE snapshots
+                ALTER COLUMN spec_type DROP DEFAULT,
+                ALTER COLUMN spec_type TYPE spectype USING spec_type::spectype,
+                ALTER COLUMN spec_type SET DEFAULT 'STABLE'
+            """))
+
+        change_maturity = conn.execute(text("""
+            SELECT udt_name FROM information_schema.columns
+            WHERE table_name = 'changes' AND column_name = 'change_maturity'
+        """)).scalar()
+        if change_maturity != "changematurity":
+            conn.execute(text("""
+                ALTER TABLE changes
+                ALTER COLUMN change_maturity TYPE changematurity USING change_maturity::changematurity
+            """))
+
+        conn.commit()
+        print("✅ Migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
@@ -1,10 +1,33 @@
 import os
 import pathlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
 #Tring save and run
-# Project structure
+# Dependencies written to requirements.txt; mirrors requirements-local.txt
+# (keep the two in sync - the app needs the async SQLAlchemy stack, asyncpg,
+# orjson and ijson, and FastAPI >= 0.121)
+PINS = (
+    b"fastapi>=0.121.0",
+    b"uvicorn[standard]>=0.24.0",
+    b"sqlalchemy[asyncio]>=2.0.23",
+    b"psycopg2-binary>=2.9.9",
+    b"asyncpg>=0.29.0",
+    b"pydantic>=2.5.0",
+    b"pydantic-settings>=2.1.0",
+    b"python-dotenv>=1.0.0",
+    b"httpx>=0.25.2",
+    b"ijson>=3.1",
+    b"orjson>=3.9.10",
+    b"openai>=1.3.7",
+    b"apscheduler>=3.10.4",
+    b"alembic>=1.13.0",
+)
+
+# Project structure; contents are bytes literals (ASCII only) so they are
+# written as-is, with no encoding step
 files = {
-    ".gitignore": """# Python
+    ".gitignore": b"""# Python
 __pycache__/
 *.py[cod]
 *$py.class
@@ -28,26 +51,18 @@ env/
 Thumbs.db
 """,
 
-    "requirements.txt": """fastapi==0.104.1
-uvicorn[standard]==0.24.0
-sqlalchemy==2.0.23
-psycopg2-binary==2.9.9
-pydantic==2.5.0
-pydantic-settings==2.1.0
-python-dotenv==1.0.0
-httpx==0.25.2
-openai==1.3.7
-apscheduler==3.10.4
-alembic==1.13.0
-""",
+    # Sorted, LF-terminated lines so the file (a CI dependency-cache key) is
+    # byte-for-byte stable across runs and platforms
+    "requirements.txt": b"\n".join(sorted(PINS)) + b"\n",
 
-    "Procfile": """web: uvicorn app.main:app --host 0.0.0.0 --port $PORT
+    "Procfile": b"""web: uvicorn app.main:app --host 0.0.0.0 --port $PORT
 """,
 
-    "railway.json": """{
+    "railway.json": b"""{
   "$schema": "https://railway.app/railway.schema.json",
   "build": {
-    "builder": "NIXPACKS"
+    "builder": "DOCKERFILE",
+    "dockerfilePath": "Dockerfile"
   },
   "deploy": {
     "startCommand": "uvicorn app.main:app --host 0.0.0.0 --port $PORT",
@@ -57,7 +72,36 @@ alembic==1.13.0
 }
 """,
 
-    "README.md": """# Gateway Monitor Backend
+    # Dependencies install in their own layer, keyed on requirements.txt, so
+    # deploys that don't touch it reuse the cached layer
+    "Dockerfile": b"""FROM python:3.11-slim AS deps
+WORKDIR /app
+COPY requirements.txt .
+RUN pip install --no-cache-dir -r requirements.txt
+
+FROM deps AS app
+COPY . .
+CMD uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
+""",
+
+    # Keep the build context (and COPY . .) to the backend: no frontend,
+    # design assets, virtualenvs, bytecode, local databases or secrets
+    ".dockerignore": b""".git
+client/
+node_modules/
+attached_assets/
+.venv
+venv/
+env/
+__pycache__/
+*.py[cod]
+*.db
+*.sqlite
+.env
+.env.local
+""",
+
+    "README.md": b"""# Gateway Monitor Backend
 
 Stripe API monitoring system with change detection.
 
@@ -74,19 +118,57 @@ Stripe API monitoring system with change detection.
 - `OPENAI_API_KEY` - Your OpenAI key
 """,
 
-    "app/__init__.py": "",
-    "app/models/__init__.py": "",
-    "app/services/__init__.py": "",
-    "app/scheduler/__init__.py": "",
-    "app/db/__init__.py": "",
+    "app/__init__.py": b"",
+    "app/models/__init__.py": b"",
+    "app/services/__init__.py": b"",
+    "app/scheduler/__init__.py": b"",
+    "app/db/__init__.py": b"",
 }
 
-# Create all files and directories
-for filepath, content in files.items():
-    path = pathlib.Path(filepath)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding='utf-8')
-    print(f"✅ Created {filepath}")
-
-print("\n✅ Project structure created!")
-print("\nNext: Run create_app_files.py to generate the application code")
\ No newline at end of file
+# Usage: python setup.py [FILE ...] - writes only the named files (e.g.
+# requirements.txt), or all of them when none are given
+unknown = [target for target in sys.argv[1:] if target not in files]
+if unknown:
+    sys.exit(f"Unknown file(s): {', '.join(unknown)}\nChoose from: {', '.join(files)}")
+selected = {filepath: files[filepath] for filepath in sys.argv[1:]} or files
+
+# Create each directory once, parents before children
+directories = {pathlib.Path(filepath).parent for filepath in selected}
+for directory in sorted(directories, key=lambda d: len(d.parts)):
+    directory.mkdir(parents=True, exist_ok=True)
+
+def write_file(filepath, data):
+    """
+    Write bytes straight to the file descriptor, skipping the text-IO layers
+
+    Returns False without touching the file (or its mtime) when it already
+    holds exactly these bytes, so re-runs don't invalidate caches.
+    """
+    try:
+        with open(filepath, 'rb') as existing:
+            if existing.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may write fewer bytes than asked (signal, full disk)
+        remaining = memoryview(data)
+        while remaining:
+            remaining = remaining[os.write(fd, remaining):]
+    finally:
+        os.close(fd)
+    return True
+
+# Create all files; paths are disjoint, so the writes can overlap (map keeps
+# the results, and so the printed order, the same as the dict)
+with ThreadPoolExecutor(max_workers=min(8, len(selected))) as executor:
+    written = list(executor.map(write_file, selected.keys(), selected.values()))
+
+# Report in one write rather than a print (and possible flush) per file
+sys.stdout.write("".join(
+    f"✅ Created {filepath}\n" if created else f"➖ Unchanged {filepath}\n"
+    for filepath, created in zip(selected, written)
+) + "\n✅ Project structure created!\n"
+    "\nNext: Run create_app_files.py to generate the application code\n")
\ No newline at end of file